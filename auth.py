@@ -1,5 +1,8 @@
+import os
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -9,10 +12,19 @@ from models import User, TokenData
 SECRET_KEY = "your-secret-key-here-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+TOKEN_CACHE_TTL_SECONDS = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# FAST_HASH=1 drops bcrypt to its minimum cost so test runs aren't dominated by hashing
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=4 if os.getenv("FAST_HASH") == "1" else 12
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# token -> (user, token expiry as a unix timestamp)
+_token_cache: TTLCache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL_SECONDS)
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -20,13 +32,13 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 def authenticate_user(username: str, password: str) -> Optional[User]:
-    from database import get_user_by_username, users_db
+    from database import users_db
     user_in_db = users_db.get(username)
     if not user_in_db:
         return None
     if not verify_password(password, user_in_db.hashed_password):
         return None
-    return User(**user_in_db.dict())
+    return user_in_db.public
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -39,7 +51,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def clear_token_cache():
+    _token_cache.clear()
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    cached = _token_cache.get(token)
+    if cached is not None and cached[1] > time.time():
+        return cached[0]
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -58,6 +77,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     user = get_user_by_username(username=token_data.username)
     if user is None:
         raise credentials_exception
+    _token_cache[token] = (user, payload.get("exp", 0))
     return user
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
@@ -1,25 +1,179 @@
-from typing import Optional, List, Dict
+from typing import Any, Callable, Optional, List, Dict, Tuple, Union
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+import os
+import time
 import uuid
-from models import User, UserInDB, UserCreate, Post, PostCreate, Comment, CommentCreate, Vote
+from sortedcontainers import SortedList
+from models import User, UserCreate, PostCreate, CommentCreate
 from auth import get_password_hash
 
-users_db: Dict[str, UserInDB] = {}
-posts_db: Dict[str, Post] = {}
-comments_db: Dict[str, Comment] = {}
-votes_db: Dict[str, Vote] = {}
+
+# Storage records: plain slotted classes, converted to the Pydantic models in models.py only at the API boundary.
+# They are written out by hand rather than with @dataclass because mypyc rejects dataclasses that declare __slots__.
+class _UserRecord:
+    # public is the one User instance handed out for this account; its fields are not duplicated here
+    __slots__ = ("public", "hashed_password")
+
+    def __init__(self, public: User, hashed_password: str) -> None:
+        self.public = public
+        self.hashed_password = hashed_password
+
+class _PostRecord:
+    __slots__ = (
+        "id", "title", "content", "url", "author_id", "author_username",
+        "created_at", "created_at_ns", "upvotes", "downvotes", "score", "comment_count"
+    )
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        content: Optional[str],
+        url: Optional[str],
+        author_id: str,
+        author_username: str,
+        created_at: datetime,
+        created_at_ns: int,
+        upvotes: int,
+        downvotes: int,
+        score: int,
+        comment_count: int
+    ) -> None:
+        self.id = id
+        self.title = title
+        self.content = content
+        self.url = url
+        self.author_id = author_id
+        self.author_username = author_username
+        self.created_at = created_at
+        self.created_at_ns = created_at_ns
+        self.upvotes = upvotes
+        self.downvotes = downvotes
+        self.score = score
+        self.comment_count = comment_count
+
+class _CommentRecord:
+    __slots__ = (
+        "id", "content", "post_id", "parent_comment_id", "author_id", "author_username",
+        "created_at", "created_at_ns", "upvotes", "downvotes", "score", "replies"
+    )
+
+    def __init__(
+        self,
+        id: str,
+        content: str,
+        post_id: str,
+        parent_comment_id: Optional[str],
+        author_id: str,
+        author_username: str,
+        created_at: datetime,
+        created_at_ns: int,
+        upvotes: int,
+        downvotes: int,
+        score: int,
+        replies: List["_CommentRecord"]
+    ) -> None:
+        self.id = id
+        self.content = content
+        self.post_id = post_id
+        self.parent_comment_id = parent_comment_id
+        self.author_id = author_id
+        self.author_username = author_username
+        self.created_at = created_at
+        self.created_at_ns = created_at_ns
+        self.upvotes = upvotes
+        self.downvotes = downvotes
+        self.score = score
+        self.replies = replies
+
+# {key: [records]} view over a table, built on the first read and then kept current by add()/remove().
+class SecondaryIndex:
+    def __init__(self, source: Dict[str, Any], key_fn: Callable[[Any], str]):
+        self._source = source
+        self._key_fn = key_fn
+        self._map: Optional[Dict[str, List[Any]]] = None
+
+    def get(self, value: str) -> List[Any]:
+        if self._map is None:
+            self._map = defaultdict(list)
+            for record in self._source.values():
+                self._map[self._key_fn(record)].append(record)
+        return self._map.get(value, [])
+
+    # Both are no-ops until the first get(): the initial build reads the records straight from the table
+    def add(self, record: Any) -> None:
+        if self._map is not None:
+            self._map[self._key_fn(record)].append(record)
+
+    def remove(self, record: Any) -> None:
+        if self._map is not None:
+            bucket = self._map[self._key_fn(record)]
+            bucket.remove(record)
+            if not bucket:
+                del self._map[self._key_fn(record)]
+
+
+def _post_sort_key(post: _PostRecord) -> int:
+    return -post.created_at_ns
+
+def _comment_sort_key(comment: _CommentRecord) -> int:
+    return comment.created_at_ns
+
+def _new_comment_bucket() -> SortedList:
+    return SortedList(key=_comment_sort_key)
+
+def _post_author(post: _PostRecord) -> str:
+    return post.author_id
+
+
+users_db: Dict[str, _UserRecord] = {}
+posts_db: Dict[str, _PostRecord] = {}
+comments_db: Dict[str, _CommentRecord] = {}
+# target id -> {user id: is_upvote}
+post_votes: Dict[str, Dict[str, bool]] = {}
+comment_votes: Dict[str, Dict[str, bool]] = {}
+users_by_id: Dict[str, str] = {}
+posts_sorted: SortedList = SortedList(key=_post_sort_key)
+comments_by_post: Dict[str, SortedList] = defaultdict(_new_comment_bucket)
+posts_by_author = SecondaryIndex(posts_db, _post_author)
+
+def reset_all() -> None:
+    # Rebinds every table and index to a fresh empty one instead of clearing them entry by entry
+    global users_db, posts_db, comments_db, post_votes, comment_votes
+    global users_by_id, posts_sorted, comments_by_post, posts_by_author
+
+    users_db = {}
+    posts_db = {}
+    comments_db = {}
+    post_votes = {}
+    comment_votes = {}
+    users_by_id = {}
+    posts_sorted = SortedList(key=_post_sort_key)
+    comments_by_post = defaultdict(_new_comment_bucket)
+    posts_by_author = SecondaryIndex(posts_db, _post_author)
+
+# (previous vote or None, new vote) -> (upvotes delta, downvotes delta); repeat votes never reach the table
+_VOTE_DELTAS: Dict[Tuple[Optional[bool], bool], Tuple[int, int]] = {
+    (None, True): (1, 0),
+    (None, False): (0, 1),
+    (False, True): (1, -1),
+    (True, False): (-1, 1),
+}
+
+def _now() -> Tuple[datetime, int]:
+    # One clock read for both the API timestamp and the integer sort key
+    now_ns = time.time_ns()
+    return datetime.fromtimestamp(now_ns / 1_000_000_000, timezone.utc), now_ns
 
 def get_user_by_username(username: str) -> Optional[User]:
-    user_in_db = users_db.get(username)
-    if user_in_db:
-        return User(**user_in_db.dict())
-    return None
+    record = users_db.get(username)
+    return record.public if record else None
 
 def get_user_by_id(user_id: str) -> Optional[User]:
-    for user in users_db.values():
-        if user.id == user_id:
-            return User(**user.dict())
-    return None
+    username = users_by_id.get(user_id)
+    return get_user_by_username(username) if username else None
 
 def authenticate_user(username: str, password: str) -> Optional[User]:
     user = users_db.get(username)
@@ -28,39 +182,54 @@ def authenticate_user(username: str, password: str) -> Optional[User]:
     from auth import verify_password
     if not verify_password(password, user.hashed_password):
         return None
-    return User(**user.dict())
+    return user.public
 
 def create_user(user: UserCreate) -> User:
     if user.username in users_db:
         raise ValueError("Username already exists")
 
-    user_id = str(uuid.uuid4())
-    hashed_password = get_password_hash(user.password)
+    return _insert_user(user, get_password_hash(user.password))
+
+def create_users_bulk(users: List[UserCreate]) -> List[User]:
+    usernames = [user.username for user in users]
+    if len(set(usernames)) != len(usernames) or any(name in users_db for name in usernames):
+        raise ValueError("Username already exists")
+
+    # bcrypt releases the GIL while hashing, so threads hash in parallel
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        hashed_passwords = list(executor.map(get_password_hash, [user.password for user in users]))
+
+    return [_insert_user(user, hashed) for user, hashed in zip(users, hashed_passwords)]
+
+def _insert_user(user: UserCreate, hashed_password: str) -> User:
+    user_id = uuid.uuid4().hex
 
-    user_in_db = UserInDB(
+    public = User.model_construct(
         id=user_id,
         username=user.username,
         email=user.email,
-        hashed_password=hashed_password,
         created_at=datetime.now(timezone.utc),
         karma=0,
         is_active=True
     )
 
-    users_db[user.username] = user_in_db
-    return User(**user_in_db.dict())
+    users_db[user.username] = _UserRecord(public=public, hashed_password=hashed_password)
+    users_by_id[user_id] = user.username
+    return public
 
-def create_post(post: PostCreate, author: User) -> Post:
-    post_id = str(uuid.uuid4())
+def create_post(post: PostCreate, author: User) -> _PostRecord:
+    post_id = uuid.uuid4().hex
+    created_at, created_at_ns = _now()
 
-    new_post = Post(
+    new_post = _PostRecord(
         id=post_id,
         title=post.title,
         content=post.content,
         url=post.url,
         author_id=author.id,
         author_username=author.username,
-        created_at=datetime.now(timezone.utc),
+        created_at=created_at,
+        created_at_ns=created_at_ns,
         upvotes=0,
         downvotes=0,
         score=0,
@@ -68,17 +237,21 @@ def create_post(post: PostCreate, author: User) -> Post:
     )
 
     posts_db[post_id] = new_post
+    posts_sorted.add(new_post)
+    posts_by_author.add(new_post)
     return new_post
 
-def get_post_by_id(post_id: str) -> Optional[Post]:
+def get_post_by_id(post_id: str) -> Optional[_PostRecord]:
     return posts_db.get(post_id)
 
-def get_posts(skip: int = 0, limit: int = 100) -> List[Post]:
-    posts = list(posts_db.values())
-    posts.sort(key=lambda x: x.created_at, reverse=True)
-    return posts[skip:skip + limit]
+def get_posts(skip: int = 0, limit: int = 100) -> List[_PostRecord]:
+    posts: List[_PostRecord] = posts_sorted[skip:skip + limit]
+    return posts
+
+def get_posts_by_author(author_id: str) -> List[_PostRecord]:
+    return posts_by_author.get(author_id)[::-1]
 
-def update_post(post_id: str, title: Optional[str] = None, content: Optional[str] = None) -> Optional[Post]:
+def update_post(post_id: str, title: Optional[str] = None, content: Optional[str] = None) -> Optional[_PostRecord]:
     post = posts_db.get(post_id)
     if not post:
         return None
@@ -92,24 +265,29 @@ def update_post(post_id: str, title: Optional[str] = None, content: Optional[str
 
 def delete_post(post_id: str) -> bool:
     if post_id in posts_db:
-        del posts_db[post_id]
-        for comment_id in list(comments_db.keys()):
-            if comments_db[comment_id].post_id == post_id:
-                del comments_db[comment_id]
+        post = posts_db.pop(post_id)
+        posts_sorted.remove(post)
+        posts_by_author.remove(post)
+        post_votes.pop(post_id, None)
+        for comment in comments_by_post.pop(post_id, []):
+            comments_db.pop(comment.id, None)
+            comment_votes.pop(comment.id, None)
         return True
     return False
 
-def create_comment(comment: CommentCreate, author: User) -> Comment:
-    comment_id = str(uuid.uuid4())
+def create_comment(comment: CommentCreate, author: User) -> _CommentRecord:
+    comment_id = uuid.uuid4().hex
+    created_at, created_at_ns = _now()
 
-    new_comment = Comment(
+    new_comment = _CommentRecord(
         id=comment_id,
         content=comment.content,
         post_id=comment.post_id,
         parent_comment_id=comment.parent_comment_id,
         author_id=author.id,
         author_username=author.username,
-        created_at=datetime.now(timezone.utc),
+        created_at=created_at,
+        created_at_ns=created_at_ns,
         upvotes=0,
         downvotes=0,
         score=0,
@@ -117,83 +295,52 @@ def create_comment(comment: CommentCreate, author: User) -> Comment:
     )
 
     comments_db[comment_id] = new_comment
+    comments_by_post[comment.post_id].add(new_comment)
 
     if comment.post_id in posts_db:
         posts_db[comment.post_id].comment_count += 1
 
     return new_comment
 
-def get_comments_by_post(post_id: str) -> List[Comment]:
-    post_comments = [c for c in comments_db.values() if c.post_id == post_id]
-    post_comments.sort(key=lambda x: x.created_at)
-    return post_comments
+def get_comments_by_post(post_id: str) -> List[_CommentRecord]:
+    return list(comments_by_post.get(post_id, []))
 
-def vote_on_post(post_id: str, user: User, is_upvote: bool) -> Optional[Post]:
+def vote_on_post(post_id: str, user: User, is_upvote: bool) -> Optional[_PostRecord]:
     post = posts_db.get(post_id)
     if not post:
         return None
 
-    vote_id = f"{user.id}_{post_id}_post"
-    existing_vote = votes_db.get(vote_id)
-
-    if existing_vote:
-        if existing_vote.is_upvote != is_upvote:
-            existing_vote.is_upvote = is_upvote
-            if is_upvote:
-                post.upvotes += 1
-                post.downvotes -= 1
-            else:
-                post.upvotes -= 1
-                post.downvotes += 1
-    else:
-        vote = Vote(
-            id=vote_id,
-            user_id=user.id,
-            post_id=post_id,
-            is_upvote=is_upvote,
-            created_at=datetime.now(timezone.utc)
-        )
-        votes_db[vote_id] = vote
-
-        if is_upvote:
-            post.upvotes += 1
-        else:
-            post.downvotes += 1
-
-    post.score = post.upvotes - post.downvotes
+    votes = post_votes.get(post_id)
+    if votes is None:
+        votes = post_votes[post_id] = {}
+
+    _apply_vote(post, votes, user.id, is_upvote)
     return post
 
-def vote_on_comment(comment_id: str, user: User, is_upvote: bool) -> Optional[Comment]:
+def vote_on_comment(comment_id: str, user: User, is_upvote: bool) -> Optional[_CommentRecord]:
     comment = comments_db.get(comment_id)
     if not comment:
         return None
 
-    vote_id = f"{user.id}_{comment_id}_comment"
-    existing_vote = votes_db.get(vote_id)
-
-    if existing_vote:
-        if existing_vote.is_upvote != is_upvote:
-            existing_vote.is_upvote = is_upvote
-            if is_upvote:
-                comment.upvotes += 1
-                comment.downvotes -= 1
-            else:
-                comment.upvotes -= 1
-                comment.downvotes += 1
-    else:
-        vote = Vote(
-            id=vote_id,
-            user_id=user.id,
-            comment_id=comment_id,
-            is_upvote=is_upvote,
-            created_at=datetime.now(timezone.utc)
-        )
-        votes_db[vote_id] = vote
-
-        if is_upvote:
-            comment.upvotes += 1
-        else:
-            comment.downvotes += 1
-
-    comment.score = comment.upvotes - comment.downvotes
+    votes = comment_votes.get(comment_id)
+    if votes is None:
+        votes = comment_votes[comment_id] = {}
+
+    _apply_vote(comment, votes, user.id, is_upvote)
     return comment
+
+def _apply_vote(
+    target: Union[_PostRecord, _CommentRecord],
+    votes: Dict[str, bool],
+    user_id: str,
+    is_upvote: bool
+) -> None:
+    previous = votes.get(user_id)
+    if previous == is_upvote:
+        return
+    votes[user_id] = is_upvote
+
+    upvotes_delta, downvotes_delta = _VOTE_DELTAS[(previous, is_upvote)]
+    target.upvotes += upvotes_delta
+    target.downvotes += downvotes_delta
+    target.score = target.upvotes - target.downvotes
@@ -1,13 +1,34 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Response, status
+from fastapi.responses import ORJSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from typing import List
 from datetime import timedelta
+from pydantic import TypeAdapter
 
 from models import User, UserCreate, Post, PostCreate, PostUpdate, Comment, CommentCreate, Token, VoteBase
 from auth import authenticate_user, create_access_token, get_current_active_user, ACCESS_TOKEN_EXPIRE_MINUTES
 import database
 
-app = FastAPI(title="Reddit-like API", version="1.0.0", description="A Reddit-like social media API")
+app = FastAPI(
+    title="Reddit-like API",
+    version="1.0.0",
+    description="A Reddit-like social media API",
+    default_response_class=ORJSONResponse
+)
+
+# Built once so list endpoints reuse the compiled serializers instead of going through response_model
+_POSTS_ADAPTER = TypeAdapter(List[Post])
+_COMMENTS_ADAPTER = TypeAdapter(List[Comment])
+
+# Only declared fields are copied: model_construct keeps unknown keys (e.g. created_at_ns) on the instance
+_POST_FIELDS = tuple(Post.model_fields)
+_COMMENT_FIELDS = tuple(Comment.model_fields)
+
+def _post_out(record) -> Post:
+    return Post.model_construct(**{field: getattr(record, field) for field in _POST_FIELDS})
+
+def _comment_out(record) -> Comment:
+    return Comment.model_construct(**{field: getattr(record, field) for field in _COMMENT_FIELDS})
 
 @app.get("/")
 async def root():
@@ -47,18 +68,19 @@ async def create_post(
     post: PostCreate,
     current_user: User = Depends(get_current_active_user)
 ):
-    return database.create_post(post, current_user)
+    return _post_out(database.create_post(post, current_user))
 
-@app.get("/posts/", response_model=List[Post])
+@app.get("/posts/", response_model=None, responses={200: {"model": List[Post]}})
 async def get_posts(skip: int = 0, limit: int = 100):
-    return database.get_posts(skip=skip, limit=limit)
+    posts = [_post_out(post) for post in database.get_posts(skip=skip, limit=limit)]
+    return Response(_POSTS_ADAPTER.dump_json(posts), media_type="application/json")
 
 @app.get("/posts/{post_id}", response_model=Post)
 async def get_post(post_id: str):
     post = database.get_post_by_id(post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    return _post_out(post)
 
 @app.put("/posts/{post_id}", response_model=Post)
 async def update_post(
@@ -78,7 +100,7 @@ async def update_post(
         title=post_update.title,
         content=post_update.content
     )
-    return updated_post
+    return _post_out(updated_post)
 
 @app.delete("/posts/{post_id}")
 async def delete_post(
@@ -104,7 +126,7 @@ async def vote_on_post(
     updated_post = database.vote_on_post(post_id, current_user, vote.is_upvote)
     if not updated_post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return updated_post
+    return _post_out(updated_post)
 
 @app.post("/posts/{post_id}/comments/", response_model=Comment)
 async def create_comment(
@@ -118,11 +140,12 @@ async def create_comment(
     if not database.get_post_by_id(post_id):
         raise HTTPException(status_code=404, detail="Post not found")
 
-    return database.create_comment(comment_data, current_user)
+    return _comment_out(database.create_comment(comment_data, current_user))
 
-@app.get("/posts/{post_id}/comments/", response_model=List[Comment])
+@app.get("/posts/{post_id}/comments/", response_model=None, responses={200: {"model": List[Comment]}})
 async def get_comments(post_id: str):
-    return database.get_comments_by_post(post_id)
+    comments = [_comment_out(comment) for comment in database.get_comments_by_post(post_id)]
+    return Response(_COMMENTS_ADAPTER.dump_json(comments), media_type="application/json")
 
 @app.post("/comments/{comment_id}/vote", response_model=Comment)
 async def vote_on_comment(
@@ -133,7 +156,7 @@ async def vote_on_comment(
     updated_comment = database.vote_on_comment(comment_id, current_user, vote.is_upvote)
     if not updated_comment:
         raise HTTPException(status_code=404, detail="Comment not found")
-    return updated_comment
+    return _comment_out(updated_comment)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional, List
 from datetime import datetime
 import uuid
@@ -17,11 +17,7 @@ class User(UserBase):
     karma: int = 0
     is_active: bool = True
 
-    class Config:
-        from_attributes = True
-
-class UserInDB(User):
-    hashed_password: str
+    model_config = ConfigDict(from_attributes=True)
 
 class Token(BaseModel):
     access_token: str
@@ -52,8 +48,7 @@ class Post(PostBase):
     score: int = 0
     comment_count: int = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="forbid")
 
 class CommentBase(BaseModel):
     content: str
@@ -74,15 +69,7 @@ class Comment(CommentBase):
     score: int = 0
     replies: List['Comment'] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, extra="forbid")
 
 class VoteBase(BaseModel):
     is_upvote: bool
-
-class Vote(VoteBase):
-    id: str
-    user_id: str
-    post_id: Optional[str] = None
-    comment_id: Optional[str] = None
-    created_at: datetime
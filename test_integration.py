@@ -1,16 +1,17 @@
+import time
 import pytest
 from fastapi.testclient import TestClient
+from jose import JWTError
 from main import app
+import auth
 import database
 
 client = TestClient(app)
 
 @pytest.fixture(autouse=True)
 def clear_database():
-    database.users_db.clear()
-    database.posts_db.clear()
-    database.comments_db.clear()
-    database.votes_db.clear()
+    database.reset_all()
+    auth.clear_token_cache()
     yield
 
 @pytest.fixture
@@ -84,6 +85,42 @@ class TestUserRegistrationAndAuth:
         assert second_response.status_code == 400
         assert "Username already exists" in second_response.json()["detail"]
 
+class TestTokenCache:
+    @staticmethod
+    def _fail_decode(*args, **kwargs):
+        raise JWTError("decode should not be reached")
+
+    def test_repeat_request_is_served_from_cache(self, authenticated_user, monkeypatch):
+        """Test that a second request with the same token skips JWT decoding"""
+        assert client.get("/users/me", headers=authenticated_user).status_code == 200
+
+        monkeypatch.setattr(auth.jwt, "decode", self._fail_decode)
+        cached_response = client.get("/users/me", headers=authenticated_user)
+        assert cached_response.status_code == 200
+        assert cached_response.json()["username"] == "testuser"
+
+    def test_expired_cache_entry_is_not_served(self, authenticated_user, monkeypatch):
+        """Test that a cached token past its exp goes back through decoding"""
+        assert client.get("/users/me", headers=authenticated_user).status_code == 200
+
+        token = authenticated_user["Authorization"].split(" ", 1)[1]
+        user, _ = auth._token_cache[token]
+        auth._token_cache[token] = (user, time.time() - 1)
+
+        monkeypatch.setattr(auth.jwt, "decode", self._fail_decode)
+        assert client.get("/users/me", headers=authenticated_user).status_code == 401
+
+    def test_invalid_tokens_are_not_cached(self):
+        """Test that tokens failing validation never enter the cache"""
+        bad_signature = "not-a-jwt"
+        unknown_user = auth.create_access_token(data={"sub": "ghost"})
+
+        for token in (bad_signature, unknown_user):
+            response = client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 401
+            assert token not in auth._token_cache
+
+
 class TestPostManagement:
     def test_complete_post_lifecycle(self, authenticated_user):
         """Test creating, reading, updating, and deleting posts"""
@@ -109,6 +146,10 @@ class TestPostManagement:
         assert fetched_post["id"] == post_id
         assert fetched_post["title"] == "My First Post"
 
+        list_response = client.get("/posts/")
+        assert list_response.status_code == 200
+        assert list_response.json() == [fetched_post]
+
         update_data = {
             "title": "Updated Post Title",
             "content": "Updated content"
@@ -196,8 +237,7 @@ class TestPostVotingAndComments:
         get_comments_response = client.get(f"/posts/{post_id}/comments/")
         assert get_comments_response.status_code == 200
         comments = get_comments_response.json()
-        assert len(comments) == 1
-        assert comments[0]["id"] == comment_id
+        assert comments == [comment]
 
         comment_upvote_data = {"is_upvote": True}
         comment_vote_response = client.post(f"/comments/{comment_id}/vote", json=comment_upvote_data, headers=headers)
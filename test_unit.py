@@ -1,15 +1,12 @@
 import pytest
-from models import UserCreate, PostCreate
+from models import UserCreate, PostCreate, CommentCreate
 from auth import get_password_hash, verify_password
 import database
 
 
 @pytest.fixture(autouse=True)
 def clear_database():
-    database.users_db.clear()
-    database.posts_db.clear()
-    database.comments_db.clear()
-    database.votes_db.clear()
+    database.reset_all()
     yield
 
 
@@ -52,6 +49,18 @@ class TestUserCreation:
         assert created_user.is_active is True
         assert created_user.created_at is not None
 
+    def test_user_lookups_share_one_instance(self):
+        """Test that every lookup path hands back the same cached User instead of rebuilding it"""
+        created_user = database.create_user(UserCreate(
+            username="testuser",
+            email="test@example.com",
+            password="password123"
+        ))
+
+        assert database.get_user_by_username("testuser") is created_user
+        assert database.get_user_by_id(created_user.id) is created_user
+        assert database.authenticate_user("testuser", "password123") is created_user
+
     def test_create_duplicate_username_fails(self):
         """Test that creating a user with duplicate username fails"""
         user_data = UserCreate(
@@ -65,6 +74,21 @@ class TestUserCreation:
         with pytest.raises(ValueError, match="Username already exists"):
             database.create_user(user_data)
 
+    def test_create_users_bulk(self):
+        """Test that bulk creation hashes every password and rejects duplicates up front"""
+        users = [
+            UserCreate(username=f"seed{i}", email=f"seed{i}@example.com", password=f"password{i}")
+            for i in range(4)
+        ]
+
+        created = database.create_users_bulk(users)
+
+        assert [u.username for u in created] == ["seed0", "seed1", "seed2", "seed3"]
+        assert database.authenticate_user("seed2", "password2") is not None
+
+        with pytest.raises(ValueError, match="Username already exists"):
+            database.create_users_bulk([UserCreate(username="seed0", email="x@example.com", password="pw")])
+
 
 class TestVotingLogic:
     def setup_method(self):
@@ -100,6 +124,16 @@ class TestVotingLogic:
         assert updated_post.downvotes == initial_downvotes + 1
         assert updated_post.score == initial_score - 1
 
+    def test_repeat_upvote_counts_once(self):
+        """Test that voting the same way twice leaves the counters unchanged"""
+        database.vote_on_post(self.post.id, self.user, is_upvote=True)
+        updated_post = database.vote_on_post(self.post.id, self.user, is_upvote=True)
+
+        assert updated_post.upvotes == 1
+        assert updated_post.downvotes == 0
+        assert updated_post.score == 1
+        assert database.post_votes[self.post.id] == {self.user.id: True}
+
     def test_change_vote_from_upvote_to_downvote(self):
         """Test changing vote from upvote to downvote"""
         database.vote_on_post(self.post.id, self.user, is_upvote=True)
@@ -111,3 +145,55 @@ class TestVotingLogic:
         assert updated_post.upvotes == initial_upvotes - 1
         assert updated_post.downvotes == initial_downvotes + 1
         assert updated_post.score == -1
+
+
+class TestPostFeed:
+    def test_get_posts_newest_first_after_delete(self):
+        """Test that the feed stays ordered newest-first as posts are added and removed"""
+        author = database.create_user(UserCreate(
+            username="author",
+            email="author@example.com",
+            password="password123"
+        ))
+
+        posts = [database.create_post(PostCreate(title=f"Post {i}"), author) for i in range(3)]
+        database.delete_post(posts[1].id)
+
+        feed = database.get_posts()
+        assert [p.id for p in feed] == [posts[2].id, posts[0].id]
+        assert [p.id for p in database.get_posts(skip=1, limit=1)] == [posts[0].id]
+
+    def test_get_posts_by_author_tracks_writes(self):
+        """Test that the per-author index picks up posts created and deleted after its first read"""
+        alice = database.create_user(UserCreate(username="alice", email="alice@example.com", password="password123"))
+        bob = database.create_user(UserCreate(username="bob", email="bob@example.com", password="password123"))
+
+        first = database.create_post(PostCreate(title="Alice 1"), alice)
+        database.create_post(PostCreate(title="Bob 1"), bob)
+        assert [p.id for p in database.get_posts_by_author(alice.id)] == [first.id]
+
+        second = database.create_post(PostCreate(title="Alice 2"), alice)
+        assert [p.id for p in database.get_posts_by_author(alice.id)] == [second.id, first.id]
+
+        database.delete_post(first.id)
+        assert [p.id for p in database.get_posts_by_author(alice.id)] == [second.id]
+        assert database.get_posts_by_author("nobody") == []
+
+    def test_delete_post_cascades_to_comments_and_votes(self):
+        """Test that deleting a post removes its comments and every related vote"""
+        author = database.create_user(UserCreate(
+            username="author",
+            email="author@example.com",
+            password="password123"
+        ))
+
+        post = database.create_post(PostCreate(title="Doomed Post"), author)
+        comment = database.create_comment(CommentCreate(content="First!", post_id=post.id), author)
+        database.vote_on_post(post.id, author, is_upvote=True)
+        database.vote_on_comment(comment.id, author, is_upvote=True)
+
+        assert database.delete_post(post.id) is True
+        assert database.get_comments_by_post(post.id) == []
+        assert comment.id not in database.comments_db
+        assert database.post_votes == {}
+        assert database.comment_votes == {}